@@ -1,27 +1,208 @@
+import asyncio
+import socket
+import struct
 import threading
 
-from pythonosc import udp_client
-from pythonosc.osc_server import BlockingOSCUDPServer
+from pythonosc import osc_bundle_builder, osc_message_builder, udp_client
+from pythonosc.osc_server import AsyncIOOSCUDPServer
 
 from ue5osc.osc_dispatcher import OSCMessageReceiver
+from ue5osc.pool import CommunicatorPool
+
+# Bound once at import so image helpers avoid the per-call import-lock and
+# sys.modules lookup of a lazy import; Pillow stays an optional dependency.
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def _build_dgram(address: str, *args) -> bytes:
+    """Serialize one OSC message to its raw datagram bytes."""
+    builder = osc_message_builder.OscMessageBuilder(address)
+    for arg in args:
+        builder.add_arg(arg)
+    return builder.build().dgram
+
+
+class FastOSCClient(udp_client.SimpleUDPClient):
+    """SimpleUDPClient that reuses one message builder per thread.
+
+    send_message normally allocates a fresh OscMessageBuilder per call, which
+    adds up to real garbage-collector pressure in kHz command loops. A
+    thread-local builder is reset between messages instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tls = threading.local()
+
+    def send(self, content) -> None:
+        """Sends a message or bundle over the connected socket.
+
+        The Communicator connects this socket once, so sending without an
+        address skips sendto's per-call address handling — and also works on
+        macOS/BSD, where sendto with an address on a connected socket raises
+        EISCONN. A connected socket reports ICMP port-unreachable as
+        ConnectionRefusedError on later sends; swallow it so every send path
+        stays fire-and-forget when UE is not up yet.
+        """
+        try:
+            self._sock.send(content.dgram)
+        except ConnectionRefusedError:
+            pass
+
+    def send_message(self, address: str, value) -> None:
+        """Build an OscMessage with the reusable builder and send it."""
+        builder = getattr(self._tls, "builder", None)
+        if builder is None:
+            builder = self._tls.builder = osc_message_builder.OscMessageBuilder()
+        builder.address = address
+        builder._args = []
+        if value is None:
+            pass
+        elif isinstance(value, (str, bytes)) or not hasattr(value, "__iter__"):
+            builder.add_arg(value)
+        else:
+            for val in value:
+                builder.add_arg(val)
+        self.send(builder.build())
+
+
+class _MessageBatch:
+    """Coalesces outgoing messages into OSC bundles sent as single datagrams.
+
+    While active, this object replaces the Communicator's client so that every
+    `send_message` call buffers instead of issuing its own `sendto` syscall.
+    Buffered messages are sent as one `#bundle` datagram when the batch exits
+    or grows past the MTU budget.
+    """
+
+    # Keep each bundle comfortably under a typical 1500 byte Ethernet MTU.
+    MAX_DGRAM_SIZE = 1400
+
+    # The "#bundle" header plus timetag.
+    _BUNDLE_OVERHEAD = 16
+
+    def __init__(self, communicator: "Communicator"):
+        self.communicator = communicator
+        self.raw_client = communicator.client
+        self._builder = None
+        self._size = 0
+        self._depth = 0
+
+    def __enter__(self):
+        self._depth += 1
+        self.communicator.client = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # Nested entries keep buffering into this batch; only the outermost
+        # exit restores the client and flushes, preserving message order.
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        self.communicator.client = self.raw_client
+        if exc_type is None:
+            self.flush()
+
+    def send_message(self, address: str, value) -> None:
+        """Buffer one message, flushing first if it would overflow the bundle."""
+        builder = osc_message_builder.OscMessageBuilder(address)
+        args = value if isinstance(value, (list, tuple)) else [value]
+        for arg in args:
+            builder.add_arg(arg)
+        message = builder.build()
+        # Each bundle element is preceded by a four byte size field.
+        if self._size + len(message.dgram) + 4 > self.MAX_DGRAM_SIZE:
+            self.flush()
+        if self._builder is None:
+            self._builder = osc_bundle_builder.OscBundleBuilder(
+                osc_bundle_builder.IMMEDIATELY
+            )
+            self._size = self._BUNDLE_OVERHEAD
+        self._builder.add_content(message)
+        self._size += len(message.dgram) + 4
+
+    def flush(self) -> None:
+        """Send any buffered messages as a single bundle datagram."""
+        if self._builder is not None:
+            self.raw_client.send(self._builder.build())
+            self._builder = None
+            self._size = 0
 
 
 class Communicator:
     """This handles interaction between the UE5 environment and a Python script."""
 
-    def __init__(self, ip: str, ue_port: int, py_port: int):
-        """Initialize OSC client and server."""
+    # Default kernel UDP buffers silently drop datagrams under bursty reply
+    # traffic from UE; 4MB absorbs bursts in both directions.
+    _SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
+    # How long save_image/reset wait for a completion ack. Kept at the
+    # wait_for_response default so the first call against a UE build without
+    # ack support stalls only briefly before falling back to fire-and-forget.
+    _ACK_TIMEOUT = 1.0
+
+    def __init__(self, ip: str, ue_port: int, py_port: int, dedup: bool = False):
+        """Initialize OSC client and server.
+
+        When dedup is True, set_location and set_yaw skip sending a value that
+        matches the previously sent one within a 1e-4 tolerance, since the UE
+        side treats the repeat as a no-op anyway.
+        """
         self.ip = ip
         self.ue_port = ue_port
         self.py_port = py_port
+        self.dedup = dedup
+        self._last_location = None
+        self._last_yaw = None
 
         self.message_handler = OSCMessageReceiver()
-        self.server = BlockingOSCUDPServer(
-            (self.ip, self.py_port), self.message_handler.dispatcher
+
+        # The receive side (event loop, bound socket, background thread) is
+        # only needed by commands that wait on a reply, so it is created
+        # lazily by _ensure_receiver rather than here.
+        self.loop = None
+        self.server = None
+        self.transport = None
+        self.protocol = None
+        self.server_thread = None
+
+        self.client = FastOSCClient(self.ip, self.ue_port)
+        self.client._sock.setsockopt(
+            socket.SOL_SOCKET, socket.SO_SNDBUF, self._SOCKET_BUFFER_SIZE
         )
-        self.client = udp_client.SimpleUDPClient(self.ip, self.ue_port)
-        self.server_thread = threading.Thread(target=self.server.serve_forever)
-        self.server_thread.start()
+
+        # The destination never changes, so connect the client socket once and
+        # send without an address, skipping per-call sockaddr validation.
+        self.client._sock.connect((self.ip, self.ue_port))
+        self._send = self.client._sock.send
+
+        # Pre-serialized datagrams for fixed-payload commands, plus address
+        # and typetag headers for single-float commands whose last four bytes
+        # are patched in with struct.pack at call time. This skips the
+        # OscMessageBuilder walk on the hot action path.
+        self._reset_dgram = _build_dgram("/reset", 0.0)
+        self._toggle_view_dgram = _build_dgram("/toggle/view", 0.0)
+        self._set_location_header = _build_dgram("/set/location", 0.0, 0.0, 0.0)[:-12]
+        self._move_forward_header = _build_dgram("/move/forward", 0.0)[:-4]
+        self._rotate_left_header = _build_dgram("/rotate/left", 0.0)[:-4]
+        self._rotate_right_header = _build_dgram("/rotate/right", 0.0)[:-4]
+
+        # Older UE builds lack the /set/yaw handler; flip this off to route
+        # set_yaw through the get-then-set fallback.
+        self._supports_set_yaw = True
+
+        # UE builds with ack support emit /ack/save and /ack/reset when the
+        # command has finished; cleared automatically when no ack arrives.
+        # Note the probe is one-way: an operation slower than _ACK_TIMEOUT
+        # also clears it. Set it back to True to probe again.
+        self._supports_ack = True
+
+        # The project name is fixed for the lifetime of a connection, so the
+        # first reply is cached and later calls skip the round trip.
+        self._project_name: str | None = None
 
     def __enter__(self):
         return self
@@ -29,63 +210,263 @@ class Communicator:
     def __exit__(self, exc_type, exc_value, traceback) -> None:
         self.close_osc()
 
+    def _ensure_receiver(self) -> None:
+        """Starts the receive loop on first use.
+
+        Send-only workloads (pure move/rotate/reset control) never wait on a
+        reply, so they skip the bound socket, event loop and background thread
+        entirely.
+        """
+        if self.loop is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.server = AsyncIOOSCUDPServer(
+            (self.ip, self.py_port), self.message_handler.dispatcher, self.loop
+        )
+        self.transport, self.protocol = self.loop.run_until_complete(
+            self.server.create_serve_endpoint()
+        )
+        server_sock = self.transport.get_extra_info("socket")
+        server_sock.setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, self._SOCKET_BUFFER_SIZE
+        )
+        self.server_thread = threading.Thread(target=self.loop.run_forever)
+        self.server_thread.start()
+
+        # Now that replies can land, ask UE to stream /state/location and
+        # /state/rotation so the pose getters can read a local mirror instead
+        # of paying a round trip per poll. Builds without the handler simply
+        # never populate the mirror.
+        self.client.send_message("/subscribe/state", 0.0)
+
     def close_osc(self) -> None:
-        """Closes the OSC server and joins the server."""
-        self.server.shutdown()
+        """Closes the OSC server and joins the event loop thread.
+
+        Safe to call more than once, or when the receiver never started.
+        """
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self.transport.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
         self.server_thread.join()
+        self.loop.close()
+        self.loop = None
+        self.server = None
+        self.transport = None
+        self.protocol = None
+        self.server_thread = None
+
+    def batch(self) -> _MessageBatch:
+        """Returns a context manager that bundles messages sent inside it.
+
+        Example: `with osc.batch(): osc.rotate_left(90); osc.move_forward(10)`
+        reaches UE as one datagram instead of one syscall per command.
+
+        Reentrant: a nested call (e.g. set_locations inside a caller's batch
+        block) joins the batch already in progress rather than starting a
+        second one.
+        """
+        if isinstance(self.client, _MessageBatch):
+            return self.client
+        return _MessageBatch(self)
 
     def send_and_await(self, osc_address: str):
         """Sends command and waits for a return value before continuing."""
         dummy_data = 0.0
-        self.client.send_message(osc_address, dummy_data)
+        self._ensure_receiver()
+        client = self.client
+        if isinstance(client, _MessageBatch):
+            # The query must observe every buffered command, so flush first.
+            client.flush()
+            client = client.raw_client
+        self.message_handler.expect_response()
+        client.send_message(osc_address, dummy_data)
         return self.message_handler.wait_for_response()
 
     def get_project_name(self) -> str:
         """Returns and optionally prints the name of the current connected project."""
-        return self.send_and_await("/get/project")
+        if self._project_name is None:
+            self._project_name = self.send_and_await("/get/project")
+        return self._project_name
 
     def get_location(self) -> tuple[float, float, float]:
         """Returns x, y, z location of the player in the Unreal Environment."""
+        mirrored = self.message_handler.latest_location
+        if mirrored is not None:
+            return mirrored
         return self.send_and_await("/get/location")
 
     def set_location(self, x: float, y: float, z: float) -> None:
         """Sets X, Y, and Z values of an Unreal Camera."""
-        self.client.send_message("/set/location", [x, y, z])
+        if self.dedup:
+            key = (round(x, 4), round(y, 4), round(z, 4))
+            if key == self._last_location:
+                return
+            self._last_location = key
+        self._send_dgram(
+            self._set_location_header + struct.pack(">fff", x, y, z),
+            "/set/location",
+            [x, y, z],
+        )
+
+    def set_locations(self, locations) -> None:
+        """Sends many /set/location commands as bundled datagrams.
+
+        locations is an iterable of (x, y, z) triples (an Nx3 array works as
+        well), useful for sweeping poses during dataset generation. Bundling
+        amortizes the per-message syscall across the whole sweep.
+        """
+        with self.batch():
+            for x, y, z in locations:
+                self.set_location(float(x), float(y), float(z))
+
+    def step_batch(self, actions) -> None:
+        """Sends a sequence of (osc_address, value) commands as one batch.
+
+        Example:
+        `osc.step_batch([("/rotate/left", 90.0), ("/move/forward", 10.0)])`
+        reaches UE as a single bundle instead of one datagram per action.
+        """
+        with self.batch():
+            for osc_address, value in actions:
+                self.client.send_message(osc_address, value)
 
     def get_rotation(self) -> tuple[float, float, float]:
         """Returns pitch, yaw, and roll."""
+        mirrored = self.message_handler.latest_rotation
+        if mirrored is not None:
+            return mirrored
         return self.send_and_await("/get/rotation")
 
     def set_yaw(self, yaw: float) -> None:
         """Set the camera yaw in degrees."""
+        if type(yaw) is not float:
+            yaw = float(yaw)
+        if self.dedup:
+            key = round(yaw, 4)
+            if key == self._last_yaw:
+                return
+            self._last_yaw = key
+        if not self._supports_set_yaw:
+            self.set_yaw_legacy(yaw)
+            return
+        self.client.send_message("/set/yaw", yaw)
+
+    def set_yaw_legacy(self, yaw: float) -> None:
+        """Set the yaw on UE builds without a /set/yaw handler.
+
+        This costs a full get_rotation round trip on top of the set, so prefer
+        set_yaw whenever the environment supports it.
+        """
         ue_roll, ue_pitch, _ = self.get_rotation()
         self.client.send_message("/set/rotation", [ue_pitch, ue_roll, yaw])
 
     def move_forward(self, amount: float) -> None:
         """Move robot forward."""
-        self.client.send_message("/move/forward", float(amount))
+        # Callers almost always pass a float already; only convert otherwise.
+        if type(amount) is not float:
+            amount = float(amount)
+        self._send_dgram(
+            self._move_forward_header + struct.pack(">f", amount),
+            "/move/forward",
+            amount,
+        )
 
     def move_backward(self, amount: float) -> None:
         """Move robot backwards."""
-        self.client.send_message("/move/forward", float(-amount))
+        self.move_forward(-amount)
 
     def rotate_left(self, degree: float) -> None:
         """Rotate robot left."""
-        self.client.send_message("/rotate/left", float(degree))
+        if type(degree) is not float:
+            degree = float(degree)
+        self._send_dgram(
+            self._rotate_left_header + struct.pack(">f", degree),
+            "/rotate/left",
+            degree,
+        )
 
     def rotate_right(self, degree: float) -> None:
         """Rotate robot right."""
-        self.client.send_message("/rotate/right", float(degree))
+        if type(degree) is not float:
+            degree = float(degree)
+        self._send_dgram(
+            self._rotate_right_header + struct.pack(">f", degree),
+            "/rotate/right",
+            degree,
+        )
 
     def set_resolution(self, resolution: str) -> None:
         """Allows you to set resolution of images in the form of ResXxResY."""
         self.client.send_message("/set/resolution", resolution)
 
+    def _send_dgram(self, dgram: bytes, osc_address: str, value) -> None:
+        """Sends a pre-serialized datagram, deferring to the message builder
+        when a batch is buffering."""
+        if isinstance(self.client, _MessageBatch):
+            self.client.send_message(osc_address, value)
+            return
+        try:
+            self._send(dgram)
+        except ConnectionRefusedError:
+            # A connected UDP socket reports ICMP port-unreachable errors on
+            # send; swallow them to keep fire-and-forget semantics when UE is
+            # not up yet.
+            pass
+
+    def _send_with_ack(self, osc_address: str, value, dgram: bytes = None) -> None:
+        """Sends a command and waits for its completion ack when supported."""
+        waiting = self._supports_ack and not isinstance(self.client, _MessageBatch)
+        if waiting:
+            self._ensure_receiver()
+            self.message_handler.expect_response()
+        if dgram is None:
+            self.client.send_message(osc_address, value)
+        else:
+            self._send_dgram(dgram, osc_address, value)
+        if not waiting:
+            return
+        try:
+            self.message_handler.wait_for_response(timeout=self._ACK_TIMEOUT)
+        except TimeoutError:
+            # No ack arrived, so assume an older UE build without ack support
+            # and stop waiting on later commands.
+            self._supports_ack = False
+
+    # matplotlib is heavyweight, so it is bound to the class on first use
+    # instead of at import.
+    _plt = None
+
+    def get_image(self, filename: str):
+        """Returns a screenshot previously written by save_image as a PIL image."""
+        if Image is None:
+            raise RuntimeError("Pillow is required for get_image")
+        return Image.open(filename)
+
+    def show_image(self, filename: str) -> None:
+        """Displays a screenshot previously written by save_image."""
+        if Communicator._plt is None:
+            import matplotlib.pyplot as plt
+
+            Communicator._plt = plt
+        self._plt.imshow(self.get_image(filename))
+        self._plt.show()
+
     def save_image(self, filename: str) -> None:
-        """Takes screenshot with the default name."""
+        """Takes screenshot with the default name and waits until it is saved."""
         # Unreal Engine Needs a forward / to separate folder from the filenames
         filename = "/".join(filename.rsplit("\\", 1))
-        self.client.send_message("/save/image", str(filename))
+        self._send_with_ack("/save/image", str(filename))
+
+    def get_image_bytes(self) -> tuple[int, int, bytes]:
+        """Returns the current frame as (width, height, raw RGBA bytes).
+
+        Unlike save_image this transfers the framebuffer directly over OSC as
+        a blob, skipping the PNG encode on the UE side and the disk round
+        trip. Reshape the bytes with
+        `np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)`.
+        """
+        return self.send_and_await("/get/framebuffer")
 
     def console(self, message: str) -> None:
         """Sends Unreal Engine console commands (only works in development mode)."""
@@ -93,14 +474,16 @@ class Communicator:
 
     def toggle_camera_view(self) -> None:
         """Toggles the camera between 1st and 3rd person views."""
-        dummy = 0.0
-        self.client.send_message("/toggle/view", dummy)
+        self._send_dgram(self._toggle_view_dgram, "/toggle/view", 0.0)
 
     def set_quality(self, graphics_level: int) -> None:
         """Set the graphics quality level from 0 (low) to 4 (high)."""
         self.client.send_message("/set/quality", graphics_level)
 
     def reset(self) -> None:
-        """Reset agent to the start location using a UE Blueprint command."""
-        # The python OSC library send_message method always requires a value
-        self.client.send_message("/reset", 0.0)
+        """Reset agent to the start location and wait for UE to finish."""
+        # The reset moves the agent, so the dedup cache no longer reflects it.
+        self._last_location = None
+        self._last_yaw = None
+        # OSC messages always carry a value, even for argument-less commands
+        self._send_with_ack("/reset", 0.0, dgram=self._reset_dgram)
@@ -1,23 +1,72 @@
-from time import sleep
+import queue
 from typing import Any, List
 
 from pythonosc.dispatcher import Dispatcher
 
 
+class FastDispatcher(Dispatcher):
+    """Dispatcher that resolves literal addresses with a dict lookup.
+
+    The stock Dispatcher compiles every incoming address into a regex and
+    walks the full mapping table per packet. The addresses this package
+    registers form a small closed set of literals, so replies are served from
+    an exact-match dict in O(1); anything containing OSC wildcards still goes
+    through the regex path.
+    """
+
+    _WILDCARDS = frozenset("*?[]{}")
+
+    def __init__(self):
+        super().__init__()
+        self._exact = {}
+
+    def map(self, address, handler, *args, needs_reply_address=False):
+        handlerobj = super().map(
+            address, handler, *args, needs_reply_address=needs_reply_address
+        )
+        if not self._WILDCARDS.intersection(address):
+            self._exact.setdefault(address, []).append(handlerobj)
+        return handlerobj
+
+    def unmap(self, address, handler, *args, needs_reply_address=False):
+        super().unmap(address, handler, *args, needs_reply_address=needs_reply_address)
+        # super().unmap validated the handler, so mirror the removal here.
+        if address in self._exact:
+            self._exact[address] = [
+                h for h in self._exact[address] if h in self._map[address]
+            ]
+
+    def handlers_for_address(self, address_pattern):
+        handlers = self._exact.get(address_pattern)
+        if handlers:
+            yield from handlers
+            return
+        yield from super().handlers_for_address(address_pattern)
+
+
 class OSCMessageReceiver:
     def __init__(self):
-        self.values = None
-        self.dispatcher = Dispatcher()
+        self._responses = queue.SimpleQueue()
+
+        # Most recent pose pushed by a UE /state broadcast, or None when the
+        # environment has not streamed any state yet.
+        self.latest_location = None
+        self.latest_rotation = None
+
+        self.dispatcher = FastDispatcher()
 
         # Map commands to the set_filter method
         self.dispatcher.map("/location", self.handle_location)
         self.dispatcher.map("/rotation", self.handle_rotation)
+        self.dispatcher.map("/state/location", self.handle_state_location)
+        self.dispatcher.map("/state/rotation", self.handle_state_rotation)
         self.dispatcher.map("/project", self.handle_project)
+        self.dispatcher.map("/framebuffer", self.handle_framebuffer)
+        self.dispatcher.map("/ack/save", self.handle_ack)
+        self.dispatcher.map("/ack/reset", self.handle_ack)
         self.dispatcher.set_default_handler(self.handle_invalid_command)
 
-    def handle_location(
-        self, address: str, *args: List[Any]
-    ) -> tuple[float, float, float]:
+    def handle_location(self, address: str, *args: List[Any]) -> None:
         # Logic to handle location path
 
         # This check is necessary
@@ -25,38 +74,76 @@ class OSCMessageReceiver:
             # Split the string argument into three float values
             values = args[0].split(",")
             x, y, z = map(float, values)
-            self.values = x, y, z
-            return self.values
+            self._resolve((x, y, z))
 
-    def handle_rotation(
-        self, address: str, *args: List[Any]
-    ) -> tuple[float, float, float]:
+    def handle_rotation(self, address: str, *args: List[Any]) -> None:
         if address == "/rotation":
             values = args[0].split(",")
             roll, pitch, yaw = map(float, values)
-            self.values = roll, pitch, yaw
-            return self.values
+            self._resolve((roll, pitch, yaw))
 
-    def handle_project(self, address: str, *args: List[Any]) -> str:
+    def handle_project(self, address: str, *args: List[Any]) -> None:
         if address == "/project":
             # Logic to handle the project path
             if not len(args) == 1 or type(args[0]) is not str:
                 return
-            self.values = args[0]
-            return self.values
+            self._resolve(args[0])
+
+    def handle_state_location(self, address: str, *args: List[Any]) -> None:
+        if address == "/state/location":
+            # The stream arrives at 60Hz, so drop malformed broadcasts
+            # silently rather than raising per packet in the event loop.
+            if not len(args) == 1 or type(args[0]) is not str:
+                return
+            try:
+                x, y, z = map(float, args[0].split(","))
+            except ValueError:
+                return
+            # Tuple assignment is atomic under the GIL, so readers on other
+            # threads never observe a partial update.
+            self.latest_location = (x, y, z)
+
+    def handle_state_rotation(self, address: str, *args: List[Any]) -> None:
+        if address == "/state/rotation":
+            if not len(args) == 1 or type(args[0]) is not str:
+                return
+            try:
+                roll, pitch, yaw = map(float, args[0].split(","))
+            except ValueError:
+                return
+            self.latest_rotation = (roll, pitch, yaw)
+
+    def handle_framebuffer(self, address: str, *args: List[Any]) -> None:
+        if address == "/framebuffer":
+            # Width and height arrive ahead of the raw RGBA blob.
+            if len(args) != 3:
+                return
+            width, height, data = args
+            self._resolve((int(width), int(height), data))
+
+    def handle_ack(self, address: str, *args: List[Any]) -> None:
+        # UE emits these once a /save/image or /reset command has finished.
+        self._resolve(address)
 
     def handle_invalid_command(self, address, *args) -> None:
         # Logic to handle invalid commands with an exception.
         raise TypeError(f"Invalid command: {address}")
 
-    def wait_for_response(self, timeout: float = 1.0, time_delta: float = 0.01):
+    def expect_response(self) -> None:
+        """Discard stale replies so the next wait returns a fresh one."""
+        while True:
+            try:
+                self._responses.get_nowait()
+            except queue.Empty:
+                return
+
+    def _resolve(self, value: Any) -> None:
+        """Hand a reply from the event loop thread to the waiting caller."""
+        self._responses.put(value)
+
+    def wait_for_response(self, timeout: float = 1.0):
         """Wait for response from UE and then return the response."""
-        time_spent_waiting = 0
-        while not self.values and time_spent_waiting < timeout:
-            sleep(time_delta)
-            time_spent_waiting += time_delta
-        response = self.values
-        if response is None:
+        try:
+            return self._responses.get(timeout=timeout)
+        except queue.Empty:
             raise TimeoutError("No response from Unreal Engine")
-        self.values = None
-        return response
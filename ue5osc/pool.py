@@ -0,0 +1,92 @@
+import queue
+import socket
+import threading
+
+from pythonosc import udp_client
+from pythonosc.osc_packet import OscPacket, ParseError
+
+
+class CommunicatorPool:
+    """Talks to many UE instances through a small shared set of reply sockets.
+
+    Running N Communicators against N UE instances costs one receive thread
+    and one bound socket each. The pool instead binds num_workers sockets to
+    one shared py_port with SO_REUSEPORT, letting the kernel hash incoming
+    datagrams across them. Each UE instance must be configured to reply to
+    py_port and to prepend its env id (its index in ue_ports) as the first
+    argument of every reply; workers demultiplex replies into per-env queues.
+    """
+
+    def __init__(self, ip: str, ue_ports, py_port: int, num_workers: int = 2):
+        """Initialize one client per UE instance and the shared receivers."""
+        self.ip = ip
+        self.ue_ports = list(ue_ports)
+        self.py_port = py_port
+
+        self.clients = [udp_client.SimpleUDPClient(ip, port) for port in self.ue_ports]
+        self._queues = [queue.SimpleQueue() for _ in self.ue_ports]
+        self._running = True
+        self._sockets = []
+        self._threads = []
+        for _ in range(max(1, min(num_workers, len(self.ue_ports)))):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            # The timeout lets the worker notice close() between datagrams.
+            sock.settimeout(0.5)
+            sock.bind((ip, py_port))
+            thread = threading.Thread(target=self._serve, args=(sock,))
+            thread.start()
+            self._sockets.append(sock)
+            self._threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _serve(self, sock: socket.socket) -> None:
+        """Receive loop for one worker socket, demuxing replies by env id."""
+        while self._running:
+            try:
+                data = sock.recv(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            try:
+                for timed_message in OscPacket(data).messages:
+                    message = timed_message.message
+                    if not message.params:
+                        continue
+                    env_id = int(message.params[0])
+                    if 0 <= env_id < len(self._queues):
+                        self._queues[env_id].put(
+                            (message.address, message.params[1:])
+                        )
+            except (ParseError, TypeError, ValueError):
+                # The shared port receives traffic the pool does not control;
+                # a malformed datagram or a non-numeric env id must not kill
+                # the worker, so drop it and keep receiving.
+                continue
+
+    def send(self, env_id: int, osc_address: str, value) -> None:
+        """Sends a command to one environment."""
+        self.clients[env_id].send_message(osc_address, value)
+
+    def send_and_await(self, env_id: int, osc_address: str, timeout: float = 1.0):
+        """Sends a command to one environment and waits for its reply."""
+        self.send(env_id, osc_address, 0.0)
+        try:
+            _, args = self._queues[env_id].get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No response from Unreal Engine env {env_id}")
+        return args[0] if len(args) == 1 else tuple(args)
+
+    def close(self) -> None:
+        """Stops the worker threads and closes the shared sockets."""
+        self._running = False
+        for thread in self._threads:
+            thread.join()
+        for sock in self._sockets:
+            sock.close()